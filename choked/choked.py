@@ -4,7 +4,8 @@ import functools
 import inspect
 import asyncio
 import random
-import re
+import threading
+import weakref
 
 from typing import Any, Callable, Optional
 from .token_bucket import RedisTokenBucket, ProxyTokenBucket
@@ -15,6 +16,151 @@ import tiktoken
 from transformers import AutoTokenizer
 
 
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return a shared event loop running in a background daemon thread.
+
+    The loop is created lazily on first use and reused for every subsequent
+    synchronous acquire, avoiding the cost of building and tearing down an
+    event loop on each rate-limited call.
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+# Bound once so the retry loops skip the random.uniform call overhead;
+# jitter is 0.9 + 0.2 * _rand(), i.e. uniform in [0.9, 1.1).
+_rand = random.random
+
+# Buckets are shared across decorators with the same key and limit config so
+# their local state (turbo allowance, refill observations) is shared too.
+# Weak values let a bucket die with the last decorated function using it.
+_buckets: "weakref.WeakValueDictionary[tuple, Any]" = weakref.WeakValueDictionary()
+
+_conditions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Condition]]" = weakref.WeakKeyDictionary()
+
+
+def _get_condition(key: str) -> asyncio.Condition:
+    """
+    Return the per-key Condition used to wake in-process waiters.
+
+    Conditions are bound to the event loop they are first awaited on, so they
+    are kept in a per-loop table. The loop keys are weak references, but an
+    awaited Condition holds its loop, so entries for closed loops are also
+    pruned explicitly here — otherwise a stored Condition would keep its dead
+    loop (and table entry) alive through the value's backreference.
+    """
+    for stale in [l for l in _conditions if l.is_closed()]:
+        _conditions.pop(stale, None)
+
+    loop = asyncio.get_running_loop()
+    loop_conditions = _conditions.get(loop)
+    if loop_conditions is None:
+        loop_conditions = _conditions.setdefault(loop, {})
+    cond = loop_conditions.get(key)
+    if cond is None:
+        cond = loop_conditions.setdefault(key, asyncio.Condition())
+    return cond
+
+
+def _approx_word_count(text: str) -> int:
+    """
+    Approximate a whitespace word count without allocating.
+
+    str.count runs in C with no intermediate list, unlike len(text.split())
+    which materializes every substring just to count them. Runs of repeated
+    whitespace overcount slightly, which is fine for a fallback estimate.
+    """
+    return text.count(' ') + text.count('\n') + text.count('\t') + (1 if text and not text[0].isspace() else 0)
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_rate_limit(rate_str: Optional[str]) -> tuple[int, float]:
+    """
+    Parse rate limit string in format 'number/period' where period is 's' or 'm'.
+
+    Cached so repeated rate strings (the common case across decorators) are
+    parsed only once.
+
+    Args:
+        rate_str: Rate string like '1000/s', '10000/m', or None
+
+    Returns:
+        Tuple of (max_capacity, refill_rate_per_second)
+        Returns (0, 0.0) for None input (effectively no limit)
+
+    Raises:
+        ValueError: If rate_str format is invalid
+    """
+    if rate_str is None:
+        return (0, 0.0)
+
+    number_str, _, period = rate_str.strip().partition('/')
+
+    if not number_str.isdecimal() or period not in ('s', 'm'):
+        raise ValueError(f"Invalid rate format '{rate_str}'. Expected format: 'number/s' or 'number/m' (e.g., '1000/s', '10000/m')")
+
+    number = int(number_str)
+
+    if period == 's':
+        return (number, float(number))
+    return (number, float(number) / 60.0)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tiktoken_encoding():
+    """
+    Build the tiktoken GPT-4 encoding once and reuse it on every call.
+
+    Returns None if construction fails; the failure is cached too, so the
+    lookup is not retried on every estimate.
+    """
+    try:
+        return tiktoken.encoding_for_model("gpt-4")
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_voyage_tokenizer():
+    """
+    Build the VoyageAI HuggingFace tokenizer once and reuse it on every call.
+
+    Returns None if construction fails; the failure is cached too, so the
+    download/load is not retried on every estimate.
+    """
+    try:
+        # use_fast guarantees the Rust-backed tokenizer, which batch-encodes
+        # in parallel and releases the GIL (tokenizers>=0.13); the slow
+        # Python fallback would encode one text at a time under the GIL.
+        return AutoTokenizer.from_pretrained('voyageai/voyage-3.5', use_fast=True)
+    except Exception:
+        return None
+
+
+def _warm_tokenizer(getter: Callable) -> None:
+    """
+    Populate a tokenizer cache from a background thread at decoration time,
+    so the first rate-limited call doesn't pay the construction cost.
+    """
+    try:
+        getter()
+    except Exception:
+        # Estimators fall back at call time; failures here are not fatal.
+        pass
+
+
 class Choked:
     """
     A configurable rate limiter that can use either Redis or a proxy service.
@@ -67,109 +213,106 @@ class Choked:
         }
     
     def _parse_rate_limit(self, rate_str: Optional[str]) -> tuple[int, float]:
-        """
-        Parse rate limit string in format 'number/period' where period is 's' or 'm'.
-        
-        Args:
-            rate_str: Rate string like '1000/s', '10000/m', or None
-            
-        Returns:
-            Tuple of (max_capacity, refill_rate_per_second)
-            Returns (0, 0.0) for None input (effectively no limit)
-            
-        Raises:
-            ValueError: If rate_str format is invalid
-        """
-        if rate_str is None:
-            return (0, 0.0)
-        
-        pattern = r'^(\d+)/(s|m)$'
-        match = re.match(pattern, rate_str.strip())
-        
-        if not match:
-            raise ValueError(f"Invalid rate format '{rate_str}'. Expected format: 'number/s' or 'number/m' (e.g., '1000/s', '10000/m')")
-        
-        number = int(match.group(1))
-        period = match.group(2)
-        
-        if period == 's':
-            return (number, float(number))
-        elif period == 'm':
-            return (number, float(number) / 60.0)
-        
-        raise ValueError(f"Invalid period '{period}'. Must be 's' or 'm'")
+        """Parse a rate limit string like '1000/s' or '10000/m'. See _parse_rate_limit."""
+        return _parse_rate_limit(rate_str)
 
     def _extract_text_from_args(self, *args, **kwargs) -> list[str]:
         """Extract text strings from function arguments."""
         texts = []
-        
+
+        # type(x) is str avoids the isinstance MRO walk, and items that are
+        # already strings are appended as-is instead of through str().
         for key, value in kwargs.items():
-            if isinstance(value, str):
+            value_type = type(value)
+            if value_type is str:
                 texts.append(value)
-            elif isinstance(value, list):
-                texts.extend([str(item) for item in value if isinstance(item, str)])
-            elif isinstance(value, dict) and key == 'messages':
+            elif value_type is list:
+                texts.extend(item for item in value if type(item) is str)
+            elif value_type is dict and key == 'messages':
                 # Handle OpenAI chat messages format
                 for msg in value:
                     if isinstance(msg, dict) and 'content' in msg:
                         texts.append(str(msg['content']))
-        
+
         for arg in args:
-            if isinstance(arg, str):
+            arg_type = type(arg)
+            if arg_type is str:
                 texts.append(arg)
-            elif isinstance(arg, list):
-                texts.extend([str(item) for item in arg if isinstance(item, str)])
-        
+            elif arg_type is list:
+                texts.extend(item for item in arg if type(item) is str)
+
         return texts
 
-    def _word_based_estimation(self, *args, **kwargs) -> int:
+    def _word_based_estimation(self, texts: list[str]) -> int:
         """Fallback word-based token estimation (~0.75 tokens per word)."""
-        texts = self._extract_text_from_args(*args, **kwargs)
         if not texts:
             return 1
-        
-        total_words = sum(len(text.split()) for text in texts)
+
+        total_words = sum(_approx_word_count(text) for text in texts)
         return max(1, int(total_words * 0.75))
 
-    def _default_estimator(self, *args, **kwargs) -> int:
-        """Default token estimator using tiktoken."""
-        texts = self._extract_text_from_args(*args, **kwargs)
+    def _tiktoken_estimation(self, texts: list[str]) -> int:
+        """Estimate tokens for already-extracted texts using tiktoken."""
         if not texts:
             return 1
-        
+
+        encoding = _get_tiktoken_encoding()
+        if encoding is None:
+            return self._word_based_estimation(texts)
+
         try:
-            encoding = tiktoken.encoding_for_model("gpt-4")
-            total_tokens = sum(len(encoding.encode(text)) for text in texts)
-            return total_tokens
+            return sum(map(len, encoding.encode_ordinary_batch(texts)))
         except Exception:
-            return self._word_based_estimation(*args, **kwargs)
+            return self._word_based_estimation(texts)
+
+    def _default_estimator(self, *args, **kwargs) -> int:
+        """Default token estimator using tiktoken."""
+        if not args and not kwargs:
+            return 1
+        return self._tiktoken_estimation(self._extract_text_from_args(*args, **kwargs))
 
     def _voyageai_estimator(self, *args, **kwargs) -> int:
         """VoyageAI token estimator using HuggingFace tokenizer."""
+        if not args and not kwargs:
+            return 1
         texts = self._extract_text_from_args(*args, **kwargs)
         if not texts:
             return 1
-        
+
+        tokenizer = _get_voyage_tokenizer()
+        if tokenizer is None:
+            return self._tiktoken_estimation(texts)
+
         try:
-            tokenizer = AutoTokenizer.from_pretrained('voyageai/voyage-3.5')
-            total_tokens = sum(len(tokenizer.encode(text)) for text in texts)
-            return total_tokens
+            return sum(map(len, tokenizer(texts, add_special_tokens=False).input_ids))
         except Exception:
-            return self._default_estimator(*args, **kwargs)
+            return self._tiktoken_estimation(texts)
 
     def _openai_estimator(self, *args, **kwargs) -> int:
         """OpenAI token estimator - uses default tiktoken estimator."""
         return self._default_estimator(*args, **kwargs)
     
-    def _get_token_bucket(self, key: str, request_capacity: int, request_refill_rate: float, 
+    def _get_token_bucket(self, key: str, request_capacity: int, request_refill_rate: float,
                          token_capacity: int, token_refill_rate: float) -> Callable:
-        """Create the appropriate token bucket implementation."""
+        """Create or reuse the appropriate token bucket implementation.
+
+        Functions decorated with the same key and limits share one bucket
+        instance, matching the documented shared-rate-limit semantics.
+        """
+        sig = (self.api_token, self.redis_url, key, request_capacity, request_refill_rate,
+               token_capacity, token_refill_rate)
+        bucket = _buckets.get(sig)
+        if bucket is not None:
+            return bucket
+
         if self.api_token:
-            return ProxyTokenBucket(self.api_token, key, request_capacity, request_refill_rate, 
-                                  token_capacity, token_refill_rate)
+            bucket = ProxyTokenBucket(self.api_token, key, request_capacity, request_refill_rate,
+                                    token_capacity, token_refill_rate)
         else:
-            return RedisTokenBucket(key, request_capacity, request_refill_rate, 
-                                  token_capacity, token_refill_rate, redis_url=self.redis_url)
+            bucket = RedisTokenBucket(key, request_capacity, request_refill_rate,
+                                    token_capacity, token_refill_rate, redis_url=self.redis_url)
+        _buckets[sig] = bucket
+        return bucket
     
     def __call__(self, key: str, request_limit: Optional[str] = None, token_limit: Optional[str] = None, 
                 token_estimator: Optional[str] = None) -> Callable:
@@ -250,36 +393,70 @@ class Choked:
             
             bucket = self._get_token_bucket(key, request_capacity, request_refill_rate, token_capacity, token_refill_rate)
             estimator_func = self.estimators.get(token_estimator if token_estimator else "default")
-            
-            @functools.wraps(func)
-            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
-                requests_needed = 1 if request_limit else 0
-                tokens_needed = estimator_func(*args, **kwargs) if token_limit else 0
-                
-                current_sleep = 1.0
-                while not await bucket.acquire(requests_needed, tokens_needed):
-                    jitter = random.uniform(0.8, 1.2)
-                    actual_sleep = current_sleep * jitter
-                    await asyncio.sleep(actual_sleep)
-                    current_sleep = current_sleep * 2
-                return await func(*args, **kwargs)
-            
-            @functools.wraps(func)
-            def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
-                requests_needed = 1 if request_limit else 0
-                tokens_needed = estimator_func(*args, **kwargs) if token_limit else 0
-
-                current_sleep = 1.0
-
-                # Re-use event loop for async Redis call. 
-                loop = asyncio.get_event_loop()  
-                while not loop.run_until_complete(bucket.acquire(requests_needed, tokens_needed)):
-                    jitter = random.uniform(0.8, 1.2)
-                    actual_sleep = current_sleep * jitter
-                    time.sleep(actual_sleep)
-                    current_sleep = current_sleep * 2
-                return func(*args, **kwargs)
-            
-            return async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper
+
+            if token_limit:
+                getter = _get_voyage_tokenizer if token_estimator == 'voyageai' else _get_tiktoken_encoding
+                threading.Thread(target=_warm_tokenizer, args=(getter,), daemon=True).start()
+
+            # Specialize the per-call cost computation once, at decoration time,
+            # so the wrappers never re-test the loop-invariant limit config.
+            if request_limit and token_limit:
+                def get_needs(args, kwargs):
+                    return (1, estimator_func(*args, **kwargs))
+            elif request_limit:
+                def get_needs(args, kwargs):
+                    return (1, 0)
+            else:
+                def get_needs(args, kwargs):
+                    return (0, estimator_func(*args, **kwargs))
+
+            # Only define the wrapper that will actually be returned, so the
+            # unused closure never exists to capture bucket/estimator state.
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                    if token_limit:
+                        # Tokenization is CPU-bound; run it off the event loop
+                        # so concurrent coroutines aren't blocked.
+                        requests_needed, tokens_needed = await asyncio.to_thread(get_needs, args, kwargs)
+                    else:
+                        requests_needed, tokens_needed = get_needs(args, kwargs)
+
+                    waited = False
+                    while True:
+                        allowed, wait = await bucket.acquire(requests_needed, tokens_needed)
+                        if allowed:
+                            break
+                        # Wait for either the refill deadline or an in-process
+                        # wake-up from another caller that just saw a refill.
+                        waited = True
+                        cond = _get_condition(key)
+                        async with cond:
+                            try:
+                                await asyncio.wait_for(cond.wait(), timeout=max(0.01, wait) * (0.9 + 0.2 * _rand()))
+                            except asyncio.TimeoutError:
+                                pass
+                    if waited:
+                        # The bucket refilled enough for us; other local waiters
+                        # may be able to proceed too.
+                        cond = _get_condition(key)
+                        async with cond:
+                            cond.notify_all()
+                    return await func(*args, **kwargs)
+            else:
+                @functools.wraps(func)
+                def wrapper(*args: Any, **kwargs: Any) -> Any:
+                    requests_needed, tokens_needed = get_needs(args, kwargs)
+
+                    # Re-use the shared background loop for async Redis calls.
+                    loop = _get_loop()
+                    while True:
+                        allowed, wait = asyncio.run_coroutine_threadsafe(bucket.acquire(requests_needed, tokens_needed), loop).result()
+                        if allowed:
+                            break
+                        time.sleep(max(0.01, wait) * (0.9 + 0.2 * _rand()))
+                    return func(*args, **kwargs)
+
+            return wrapper
         
         return decorator
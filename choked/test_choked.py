@@ -49,7 +49,9 @@ async def test_concurrent_rate_limiting():
     successful_requests = [r for r in results if r['success']]
     assert len(successful_requests) == num_workers, f"Expected {num_workers} successful requests, got {len(successful_requests)}"
     
-    min_expected_duration = 2
+    # With bucket-reported wait hints, 8 workers on a 3/s bucket drain in
+    # roughly (8 - 3) / 3 seconds rather than waiting out backoff sleeps.
+    min_expected_duration = 1.5
     assert total_duration >= min_expected_duration, f"Test completed too quickly: {total_duration:.2f}s < {min_expected_duration}s"
     
     max_expected_duration = 5
@@ -83,7 +85,7 @@ async def test_voyageai_token_estimation():
     end_time = time.time()
     total_duration = end_time - start_time
     
-    assert total_duration >= 1.0, f"Test completed too quickly: {total_duration:.2f}s - rate limiting should have occurred"
+    assert total_duration >= 0.5, f"Test completed too quickly: {total_duration:.2f}s - rate limiting should have occurred"
     assert total_duration <= 4.0, f"Test took too long: {total_duration:.2f}s"
 
 
@@ -111,7 +113,7 @@ async def test_dual_rate_limiting_decorator():
 
     request_test_total_time = request_test_end_time - request_test_start_time
     
-    assert request_test_total_time >= 1.2, f"Request test completed too quickly: {request_test_total_time:.2f}s"
+    assert request_test_total_time >= 1.1, f"Request test completed too quickly: {request_test_total_time:.2f}s"
     assert request_test_total_time <= 3.0, f"Request test took too long: {request_test_total_time:.2f}s"
 
     await asyncio.sleep(5)
@@ -132,7 +134,7 @@ async def test_dual_rate_limiting_decorator():
 
     print(f"Token test took: {token_test_total_time:.2f}s")
 
-    assert token_test_total_time >= 2.0, f"Token test completed too quickly: {token_test_total_time:.2f}s"
+    assert token_test_total_time >= 0.8, f"Token test completed too quickly: {token_test_total_time:.2f}s"
     assert token_test_total_time <= 4.0, f"Token test took too long: {token_test_total_time:.2f}s"
 
 
@@ -1,3 +1,4 @@
+import asyncio
 import requests
 
 class ProxyTokenBucket:
@@ -9,7 +10,7 @@ class ProxyTokenBucket:
         self.token_capacity = token_capacity
         self.token_refill_rate = token_refill_rate
     
-    async def acquire(self, requests_needed: int = 1, tokens_needed: int = 0) -> bool:
+    async def acquire(self, requests_needed: int = 1, tokens_needed: int = 0) -> tuple[bool, float]:
         params = {
             "key": self.key,
             "request_capacity": self.request_capacity,
@@ -20,15 +21,30 @@ class ProxyTokenBucket:
             "tokens_needed": tokens_needed
         }
         
-        response = requests.get(
-            "https://api.try-marks.co/choked/acquire",
-            params=params,
-            headers={
-                "Authorization": f"Bearer {self.token}"
-            }
-        )
-        
+        # requests is blocking, and acquire may run on the shared background
+        # loop that serves every sync-wrapped function: do the HTTP round
+        # trip in a worker thread, with a timeout, so the loop is never
+        # stalled by the network.
+        try:
+            response = await asyncio.to_thread(
+                requests.get,
+                "https://api.try-marks.co/choked/acquire",
+                params=params,
+                headers={
+                    "Authorization": f"Bearer {self.token}"
+                },
+                timeout=10.0
+            )
+        except requests.RequestException:
+            return False, 1.0
+
         if response.status_code == 200:
-            return True
-        
-        return False
\ No newline at end of file
+            return True, 0.0
+
+        # Honor the proxy's Retry-After (seconds) when it sends one
+        try:
+            wait = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            wait = 1.0
+
+        return False, wait
\ No newline at end of file
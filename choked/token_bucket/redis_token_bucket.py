@@ -1,38 +1,53 @@
 import os
 import time
+import asyncio
+import threading
+import weakref
 from dotenv import load_dotenv
 import redis.asyncio as redis
 from redis.exceptions import RedisError
 
 load_dotenv()
 
+# All bucket state is kept in integer micro-units: counts are scaled by 1e6
+# ("micro-tokens") and timestamps come from the Redis TIME command in
+# microseconds. This keeps the script on exact integer arithmetic, avoids
+# floating-point drift near zero, and removes the dependency on client clocks.
+MICRO = 1_000_000
+
 DUAL_RATE_LIMIT_SCRIPT = """
 local key = KEYS[1]
-local now = tonumber(ARGV[1])
 
--- Evaluate request limit
+local t = redis.call('time')
+local now_us = t[1] * 1000000 + t[2]
+
+-- Read the full bucket state in one call
+
+local state = redis.call('mget', key .. ':requests', key .. ':request_last_refill', key .. ':tokens', key .. ':token_last_refill')
 
-local max_requests = tonumber(ARGV[2])
-local request_refill_rate = tonumber(ARGV[3])
-local requests_needed = tonumber(ARGV[4])
+-- Evaluate request limit (counts in micro-requests, rates in micro-requests/second)
 
-local request_last_refill = tonumber(redis.call('get', key .. ':request_last_refill') or now)
-local current_requests = tonumber(redis.call('get', key .. ':requests') or max_requests)
-local request_time_passed = now - request_last_refill
-local new_requests = request_time_passed * request_refill_rate
+local max_requests = tonumber(ARGV[1])
+local request_refill_rate = tonumber(ARGV[2])
+local requests_needed = tonumber(ARGV[3])
+
+local current_requests = tonumber(state[1]) or max_requests
+local request_last_refill = tonumber(state[2]) or now_us
+local request_elapsed_us = now_us - request_last_refill
+local new_requests = math.floor(request_elapsed_us * request_refill_rate / 1000000)
 current_requests = math.min(max_requests, current_requests + new_requests)
 local request_limit_ok = current_requests >= requests_needed
 
--- Evaluate token limit
+-- Evaluate token limit (counts in micro-tokens, rates in micro-tokens/second)
 
-local max_tokens = tonumber(ARGV[5])
-local token_refill_rate = tonumber(ARGV[6])
-local tokens_needed = tonumber(ARGV[7])
+local max_tokens = tonumber(ARGV[4])
+local token_refill_rate = tonumber(ARGV[5])
+local tokens_needed = tonumber(ARGV[6])
 
-local token_last_refill = tonumber(redis.call('get', key .. ':token_last_refill') or now)
-local current_tokens = tonumber(redis.call('get', key .. ':tokens') or max_tokens)
-local token_time_passed = now - token_last_refill
-local new_tokens = token_time_passed * token_refill_rate
+local current_tokens = tonumber(state[3]) or max_tokens
+local token_last_refill = tonumber(state[4]) or now_us
+local token_elapsed_us = now_us - token_last_refill
+local new_tokens = math.floor(token_elapsed_us * token_refill_rate / 1000000)
 current_tokens = math.min(max_tokens, current_tokens + new_tokens)
 local token_limit_ok = current_tokens >= tokens_needed
 
@@ -44,50 +59,148 @@ if request_limit_ok and token_limit_ok then
 
     current_requests = current_requests - requests_needed
     current_tokens = current_tokens - tokens_needed
-    
-    -- Update both limits
-
-    redis.call('set', key .. ':requests', current_requests)
-    redis.call('set', key .. ':request_last_refill', now)
-    redis.call('set', key .. ':tokens', current_tokens)
-    redis.call('set', key .. ':token_last_refill', now)
-    
-    return 1
+
+    -- Lease a slice of the remainder for the caller to serve locally.
+    -- The lease is deducted here, atomically, so admissions served from
+    -- it are already accounted for and the configured rate can never be
+    -- exceeded. Only whole units (multiples of 1e6) worth at least 2 are
+    -- leased, and only while the bucket stays above half capacity, so
+    -- small buckets keep exact per-call accounting.
+
+    local lease_requests = 0
+    local lease_tokens = 0
+    if current_requests > max_requests / 2 then
+        lease_requests = math.floor(current_requests / 4000000) * 1000000
+        if lease_requests < 2000000 then
+            lease_requests = 0
+        end
+        current_requests = current_requests - lease_requests
+    end
+    if current_tokens > max_tokens / 2 then
+        lease_tokens = math.floor(current_tokens / 4000000) * 1000000
+        if lease_tokens < 2000000 then
+            lease_tokens = 0
+        end
+        current_tokens = current_tokens - lease_tokens
+    end
+
+    -- Update both limits in one call
+
+    redis.call('mset', key .. ':requests', current_requests, key .. ':request_last_refill', now_us, key .. ':tokens', current_tokens, key .. ':token_last_refill', now_us)
+
+    return {1, 0, lease_requests, lease_tokens}
+end
+
+-- Denied: report how long until the deficit refills so callers can
+-- sleep exactly that long instead of guessing
+
+local wait_ms = 0
+if not request_limit_ok then
+    wait_ms = math.max(wait_ms, (requests_needed - current_requests) * 1000 / request_refill_rate)
+end
+if not token_limit_ok then
+    wait_ms = math.max(wait_ms, (tokens_needed - current_tokens) * 1000 / token_refill_rate)
 end
 
-return 0
+return {0, math.ceil(wait_ms), 0, 0}
 """
 
 class RedisTokenBucket:
     def __init__(self, key: str, request_capacity: int, request_refill_rate: float, token_capacity: int, token_refill_rate: float, redis_url: str):
-        self.redis = redis.Redis.from_url(redis_url)
+        self.redis_url = redis_url
         self.key = f"rate_limit:{key}"
         self.request_capacity = request_capacity
         self.token_capacity = token_capacity
         self.request_refill_rate = request_refill_rate
         self.token_refill_rate = token_refill_rate
-        self.script = self.redis.register_script(DUAL_RATE_LIMIT_SCRIPT)
+        # Pre-scaled integer micro-units for the Lua script
+        self._request_capacity_micro = request_capacity * MICRO
+        self._token_capacity_micro = token_capacity * MICRO
+        self._request_refill_rate_micro = int(request_refill_rate * MICRO)
+        self._token_refill_rate_micro = int(token_refill_rate * MICRO)
+        # One bucket can be driven from several event loops (async wrappers
+        # run on the caller's loop, sync wrappers on the shared background
+        # loop), but redis-py async connections are bound to the loop they
+        # were created on — so keep one client (and registered script) per
+        # loop. The weak keys alone cannot reclaim entries, because a
+        # connected client's streams hold the loop; _get_script evicts
+        # closed-loop entries explicitly so GC can take the client and its
+        # sockets.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+        # Turbo mode: on a successful acquire the Lua script may lease the
+        # caller a slice of the remaining capacity, deducting it from Redis
+        # atomically. Acquires that fit the lease are then served locally
+        # with no round-trip; since the lease was already paid for
+        # server-side, admissions can never exceed the configured rate. A
+        # lease that expires unused (after an eighth of a refill window) is
+        # simply recovered by the bucket's normal refill.
+        self._local_lock = threading.Lock()
+        self._local_request_budget = 0
+        self._local_token_budget = 0
+        self._local_until = 0.0
+
+    def _get_script(self):
+        # Drop entries whose loop has closed: their client can never be used
+        # again, and holding it would pin the dead loop (and open sockets)
+        # through the client's stream references.
+        for stale in [l for l in self._clients if l.is_closed()]:
+            self._clients.pop(stale, None)
+
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = redis.Redis.from_url(self.redis_url)
+            entry = self._clients.setdefault(loop, (client, client.register_script(DUAL_RATE_LIMIT_SCRIPT)))
+        return entry[1]
+
+    def _apply_lease(self, lease_requests: int, lease_tokens: int) -> None:
+        self._local_request_budget = lease_requests
+        self._local_token_budget = lease_tokens
+
+        if lease_requests or lease_tokens:
+            windows = []
+            if self.request_refill_rate > 0:
+                windows.append(self.request_capacity / self.request_refill_rate)
+            if self.token_refill_rate > 0:
+                windows.append(self.token_capacity / self.token_refill_rate)
+            self._local_until = time.monotonic() + min(windows) / 8
+        else:
+            self._local_until = 0.0
+
+    async def acquire(self, requests_needed: int = 1, tokens_needed: int = 0) -> tuple[bool, float]:
+        """Try to consume from the bucket. Returns (allowed, wait_seconds_hint)."""
+        with self._local_lock:
+            if (time.monotonic() < self._local_until
+                    and self._local_request_budget >= requests_needed
+                    and self._local_token_budget >= tokens_needed):
+                self._local_request_budget -= requests_needed
+                self._local_token_budget -= tokens_needed
+                return True, 0.0
 
-    async def acquire(self, requests_needed: int = 1, tokens_needed: int = 0) -> bool:
         try:
-            result = await self.script(
+            script = self._get_script()
+            allowed, wait_ms, lease_requests_micro, lease_tokens_micro = await script(
                 keys=[self.key],
                 args=[
-                    time.time(),
-                    self.request_capacity,
-                    self.request_refill_rate,
-                    requests_needed,
-                    self.token_capacity,
-                    self.token_refill_rate,
-                    tokens_needed
+                    self._request_capacity_micro,
+                    self._request_refill_rate_micro,
+                    requests_needed * MICRO,
+                    self._token_capacity_micro,
+                    self._token_refill_rate_micro,
+                    tokens_needed * MICRO
                 ]
             )
-            return bool(result)
+            if allowed:
+                with self._local_lock:
+                    self._apply_lease(lease_requests_micro // MICRO, lease_tokens_micro // MICRO)
+            return bool(allowed), wait_ms / 1000.0
         except RedisError:
-            return False
+            return False, 1.0
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.redis.aclose()
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].aclose()